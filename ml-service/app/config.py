@@ -1,6 +1,8 @@
 import os
+from functools import lru_cache
 from pathlib import Path
 from pydantic_settings import BaseSettings
+import redis.asyncio as redis
 
 # Get the base directory (ml-service/)
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -9,6 +11,13 @@ class Settings(BaseSettings):
     # Sketch2Mesh repository
     SKETCH2MESH_REPO_URL: str = "https://github.com/cvlab-epfl/sketch2mesh.git"
     SKETCH2MESH_DIR: str = str(BASE_DIR / "sketch2mesh")
+    # Branch to clone (empty = remote default)
+    SKETCH2MESH_BRANCH: str = ""
+    # shallow (last SKETCH2MESH_CLONE_DEPTH commits of one branch; a depth of
+    # 0 keeps its full history), blobless (all history, file contents fetched
+    # on demand), treeless, or full
+    SKETCH2MESH_CLONE_MODE: str = "shallow"
+    SKETCH2MESH_CLONE_DEPTH: int = 1
 
     # Data directories
     MODELS_DIR: str = str(BASE_DIR / "data" / "models")
@@ -18,6 +27,17 @@ class Settings(BaseSettings):
     # Google Drive model IDs
     CARS_MODEL_GDRIVE_ID: str = "1C09_0RMiG2on8rvEqo3z79GzDoGvI3I2"
     CHAIRS_MODEL_GDRIVE_ID: str = "1MEf4p-MaSVzL9v3i1GTMzJogM_0ciz6y"
+    # Expected SHA-256 of each model zip (empty = skip verification)
+    CARS_MODEL_SHA256: str = ""
+    CHAIRS_MODEL_SHA256: str = ""
+
+    # Download model zips to disk and extract entries on a thread pool,
+    # instead of decompressing the download stream on a single thread.
+    # Only this mode uses aria2c (parallel connections) when it is installed
+    PARALLEL_EXTRACT: bool = False
+    # Leave .part files from failed downloads in MODELS_DIR so the next
+    # attempt resumes them instead of starting over
+    KEEP_PARTIAL_DOWNLOADS: bool = True
 
     # File constraints
     MAX_UPLOAD_SIZE_MB: int = 10
@@ -25,9 +45,39 @@ class Settings(BaseSettings):
 
     # Conversion settings
     DEFAULT_SKETCH_STYLE: str = "suggestive"
+    # Compress output GLBs with gltfpack (meshopt); disable for clients
+    # that can't decode EXT_meshopt_compression
+    GLB_COMPRESSION: bool = True
+
+    # Sketch analysis batching under concurrent load
+    SKETCH_BATCH_MAX_SIZE: int = 16
+    SKETCH_BATCH_WINDOW_MS: float = 5.0
+
+    # Number of uvicorn worker processes. The uvicorn CLI reads the same
+    # WEB_CONCURRENCY variable, so set it in the environment (not only .env)
+    # to keep the Docker CMD and `python -m app.main` in agreement
+    WEB_CONCURRENCY: int = 1
+
+    # Redis (shared conversion state across workers)
+    REDIS_URL: str = "redis://localhost:6379/0"
+    # Cached GLB bytes expire well before the status hashes so that, under
+    # Redis' volatile-ttl eviction, GLBs are evicted first (downloads then
+    # fall back to the file on disk)
+    GLB_CACHE_TTL_SECONDS: int = 3600
 
     class Config:
         env_file = ".env"
         case_sensitive = True
 
-settings = Settings()
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Return the process-wide settings, parsing the environment/.env only once"""
+    return Settings()
+
+settings = get_settings()
+
+# Shared async Redis client (connections are opened lazily on first use)
+redis_client = redis.from_url(settings.REDIS_URL, decode_responses=True)
+
+# Separate client for binary payloads (generated GLB files)
+redis_binary_client = redis.from_url(settings.REDIS_URL)
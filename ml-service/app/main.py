@@ -1,16 +1,19 @@
 import os
+import json
 import asyncio
 import logging
+import aiojobs
 from contextlib import asynccontextmanager
-from typing import Dict
+from typing import Optional
 from fastapi import FastAPI, UploadFile, File, Form, HTTPException
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
+from sse_starlette.sse import EventSourceResponse
 
-from app.config import settings
+from app.config import settings, redis_client, redis_binary_client
 from app.models import ConvertResponse, StatusResponse, HealthResponse
 from app.services.file_handler import FileHandler
-from app.services.sketch2mesh_service import Sketch2MeshService
+from app.services import sketch2mesh_service
 from app.utils.setup import initialize_models
 
 # Configure logging
@@ -20,10 +23,6 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Global state for tracking conversions
-# In production, use Redis or a database
-conversion_status: Dict[str, dict] = {}
-
 # Global state for initialization
 models_ready = False
 sketch2mesh_available = False
@@ -49,6 +48,15 @@ async def lifespan(app: FastAPI):
         models_ready = False
         sketch2mesh_available = False
 
+    # Start worker processes for mesh generation and the sketch analysis batcher
+    sketch2mesh_service.start_process_pool()
+    sketch2mesh_service.batcher.start()
+
+    # Bounded scheduler for background conversions; extra jobs wait in a queue
+    app.state.scheduler = aiojobs.Scheduler(
+        limit=sketch2mesh_service.process_pool_size(), pending_limit=100
+    )
+
     # Start background cleanup task
     cleanup_task = asyncio.create_task(periodic_cleanup())
 
@@ -56,12 +64,20 @@ async def lifespan(app: FastAPI):
 
     # Shutdown
     logger.info("Shutting down ML service...")
+
+    # Let in-flight conversions finish before tearing down their resources
+    await app.state.scheduler.wait_and_close()
     cleanup_task.cancel()
     try:
         await cleanup_task
     except asyncio.CancelledError:
         pass
 
+    await sketch2mesh_service.batcher.stop()
+    sketch2mesh_service.shutdown_process_pool()
+    await redis_client.aclose()
+    await redis_binary_client.aclose()
+
 
 app = FastAPI(
     title="Sketch2Mesh ML Service",
@@ -80,6 +96,63 @@ app.add_middleware(
 )
 
 
+def _status_key(mesh_id: str) -> str:
+    """Redis key holding the status hash for a conversion"""
+    return f"conv:{mesh_id}"
+
+
+def _events_channel(mesh_id: str) -> str:
+    """Redis pub/sub channel carrying status updates for a conversion"""
+    return f"conv:{mesh_id}:events"
+
+
+def _glb_key(mesh_id: str) -> str:
+    """Redis key holding the generated GLB bytes for a conversion"""
+    return f"glb:{mesh_id}"
+
+
+async def update_conversion_status(mesh_id: str, **fields):
+    """
+    Write conversion status fields to Redis, refresh the key's TTL and
+    publish the update to the conversion's events channel
+
+    Args:
+        mesh_id: The unique mesh identifier
+        **fields: Status fields to set (status, progress, error)
+    """
+    key = _status_key(mesh_id)
+    # Redis hashes cannot hold None, so a missing error is stored as ""
+    mapping = {name: "" if value is None else value for name, value in fields.items()}
+    # One MULTI/EXEC round trip, so the hash can never be left without a TTL
+    async with redis_client.pipeline(transaction=True) as pipe:
+        pipe.hset(key, mapping=mapping)
+        pipe.expire(key, settings.CLEANUP_AFTER_HOURS * 3600)
+        pipe.publish(_events_channel(mesh_id), json.dumps(fields))
+        await pipe.execute()
+
+
+async def load_conversion_status(mesh_id: str) -> Optional[dict]:
+    """
+    Read conversion status from Redis
+
+    Args:
+        mesh_id: The unique mesh identifier
+
+    Returns:
+        Status dict, or None if the conversion is unknown or expired
+    """
+    status_data = await redis_client.hgetall(_status_key(mesh_id))
+    if not status_data:
+        return None
+
+    progress = status_data.get("progress")
+    return {
+        "status": status_data["status"],
+        "progress": int(progress) if progress else None,
+        "error": status_data.get("error") or None
+    }
+
+
 async def periodic_cleanup():
     """Periodic background task for file cleanup"""
     while True:
@@ -132,22 +205,31 @@ async def convert_sketch(
         if sketch_style not in ["suggestive", "fd", "handdrawn"]:
             raise HTTPException(status_code=400, detail="sketch_style must be 'suggestive', 'fd', or 'handdrawn'")
 
+        # Reject early when the conversion queue is full; spawn() would
+        # otherwise block this request until a slot frees up
+        scheduler = app.state.scheduler
+        if scheduler.pending_count >= scheduler.pending_limit:
+            raise HTTPException(status_code=503, detail="Too many conversions in progress. Try again later.")
+
         # Save uploaded file
-        mesh_id, sketch_path = await FileHandler.save_upload(sketch)
+        mesh_id, sketch_path, content_hash = await FileHandler.save_upload(sketch)
 
         # Initialize status tracking
-        conversion_status[mesh_id] = {
-            "status": "processing",
-            "progress": 0,
-            "error": None
-        }
+        await update_conversion_status(
+            mesh_id,
+            status="processing",
+            progress=0,
+            error=None
+        )
 
         # Get output path
         output_path = FileHandler.get_output_path(mesh_id, "glb")
 
         # Start async conversion (run in background)
-        asyncio.create_task(
-            process_conversion(mesh_id, sketch_path, model_type, sketch_style, output_path)
+        await scheduler.spawn(
+            process_conversion(
+                mesh_id, sketch_path, model_type, sketch_style, output_path, content_hash
+            )
         )
 
         logger.info(f"Started conversion {mesh_id} for {model_type} model")
@@ -170,39 +252,50 @@ async def process_conversion(
     sketch_path: str,
     model_type: str,
     sketch_style: str,
-    output_path: str
+    output_path: str,
+    content_hash: str
 ):
     """Background task to process the conversion"""
     try:
         logger.info(f"Processing conversion {mesh_id}")
 
         # Update progress
-        conversion_status[mesh_id]["progress"] = 10
+        await update_conversion_status(mesh_id, progress=10)
 
         # Run sketch2mesh conversion
-        service = Sketch2MeshService()
-        conversion_status[mesh_id]["progress"] = 30
+        await update_conversion_status(mesh_id, progress=30)
 
-        success = await service.convert_sketch_to_mesh(
+        glb_data = await sketch2mesh_service.convert_sketch_to_mesh(
             sketch_path=sketch_path,
             model_type=model_type,
             sketch_style=sketch_style,
-            output_path=output_path
+            output_path=output_path,
+            content_hash=content_hash
         )
 
-        if success:
-            conversion_status[mesh_id]["status"] = "completed"
-            conversion_status[mesh_id]["progress"] = 100
+        if glb_data is not None:
+            # Keep the GLB in Redis so /download can skip the disk read; this
+            # is only a cache, since the file is already on disk at output_path
+            try:
+                await redis_binary_client.set(
+                    _glb_key(mesh_id), glb_data, ex=settings.GLB_CACHE_TTL_SECONDS
+                )
+            except Exception as e:
+                logger.warning(f"Failed to cache GLB for {mesh_id} in Redis: {str(e)}")
+
+            await update_conversion_status(mesh_id, status="completed", progress=100)
             logger.info(f"Conversion {mesh_id} completed successfully")
         else:
-            conversion_status[mesh_id]["status"] = "failed"
-            conversion_status[mesh_id]["error"] = "Conversion process failed"
+            await update_conversion_status(
+                mesh_id,
+                status="failed",
+                error="Conversion process failed"
+            )
             logger.error(f"Conversion {mesh_id} failed")
 
     except Exception as e:
         logger.error(f"Error processing conversion {mesh_id}: {str(e)}")
-        conversion_status[mesh_id]["status"] = "failed"
-        conversion_status[mesh_id]["error"] = str(e)
+        await update_conversion_status(mesh_id, status="failed", error=str(e))
 
 
 @app.get("/convert/{mesh_id}/status", response_model=StatusResponse)
@@ -216,11 +309,10 @@ async def get_conversion_status(mesh_id: str):
     Returns:
         StatusResponse with current status and progress
     """
-    if mesh_id not in conversion_status:
+    status_data = await load_conversion_status(mesh_id)
+    if status_data is None:
         raise HTTPException(status_code=404, detail="Mesh ID not found")
 
-    status_data = conversion_status[mesh_id]
-
     return StatusResponse(
         status=status_data["status"],
         progress=status_data.get("progress"),
@@ -228,6 +320,44 @@ async def get_conversion_status(mesh_id: str):
     )
 
 
+@app.get("/convert/{mesh_id}/stream")
+async def stream_conversion_status(mesh_id: str):
+    """
+    Stream status updates for a conversion as server-sent events
+
+    Args:
+        mesh_id: The unique mesh identifier
+
+    Returns:
+        EventSourceResponse emitting StatusResponse JSON until the
+        conversion completes or fails
+    """
+    # Subscribe before reading the current status so no update is missed
+    pubsub = redis_client.pubsub()
+    await pubsub.subscribe(_events_channel(mesh_id))
+
+    status_data = await load_conversion_status(mesh_id)
+    if status_data is None:
+        await pubsub.aclose()
+        raise HTTPException(status_code=404, detail="Mesh ID not found")
+
+    async def event_generator():
+        try:
+            yield {"event": "status", "data": StatusResponse(**status_data).model_dump_json()}
+
+            while status_data["status"] == "processing":
+                message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=None)
+                if message is None:
+                    continue
+
+                status_data.update(json.loads(message["data"]))
+                yield {"event": "status", "data": StatusResponse(**status_data).model_dump_json()}
+        finally:
+            await pubsub.aclose()
+
+    return EventSourceResponse(event_generator())
+
+
 @app.get("/convert/{mesh_id}/download")
 async def download_mesh(mesh_id: str):
     """
@@ -237,20 +367,28 @@ async def download_mesh(mesh_id: str):
         mesh_id: The unique mesh identifier
 
     Returns:
-        FileResponse with the GLB file
+        Response with the GLB file
     """
     # Check if conversion exists
-    if mesh_id not in conversion_status:
+    status_data = await load_conversion_status(mesh_id)
+    if status_data is None:
         raise HTTPException(status_code=404, detail="Mesh ID not found")
 
     # Check if conversion is complete
-    if conversion_status[mesh_id]["status"] != "completed":
+    if status_data["status"] != "completed":
         raise HTTPException(
             status_code=400,
-            detail=f"Conversion not completed. Status: {conversion_status[mesh_id]['status']}"
+            detail=f"Conversion not completed. Status: {status_data['status']}"
         )
 
-    # Get file path
+    headers = {"Content-Disposition": f"attachment; filename={mesh_id}.glb"}
+
+    # Serve from Redis when the GLB is still cached there
+    glb_data = await redis_binary_client.get(_glb_key(mesh_id))
+    if glb_data is not None:
+        return Response(content=glb_data, media_type="model/gltf-binary", headers=headers)
+
+    # Fall back to disk if Redis evicted the GLB
     file_path = FileHandler.get_output_path(mesh_id, "glb")
 
     # Check if file exists
@@ -262,9 +400,7 @@ async def download_mesh(mesh_id: str):
         path=file_path,
         media_type="model/gltf-binary",
         filename=f"{mesh_id}.glb",
-        headers={
-            "Content-Disposition": f"attachment; filename={mesh_id}.glb"
-        }
+        headers=headers
     )
 
 
@@ -280,4 +416,13 @@ async def root():
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # Multiple workers are safe now that conversion state lives in Redis;
+    # each one gets its share of the CPUs (see process_pool_size)
+    uvicorn.run(
+        "app.main:app",
+        host="0.0.0.0",
+        port=8000,
+        loop="uvloop",
+        http="httptools",
+        workers=settings.WEB_CONCURRENCY
+    )
@@ -1,11 +1,131 @@
 import os
 import logging
+import functools
 import numpy as np
 import trimesh
+from typing import NamedTuple, Optional
 from PIL import Image
 
+from app.config import settings
+from app.services.mesh_converter import MeshConverter
+
 logger = logging.getLogger(__name__)
 
+# Sketches are downsampled to fit this size before analysis
+ANALYSIS_SIZE = (256, 256)
+
+
+class SketchFeatures(NamedTuple):
+    """Coarse sketch properties that drive the demo mesh shape"""
+    coverage: float
+    aspect_ratio: float
+    width: int
+    height: int
+
+
+# Rotation that aligns a Z-axis cylinder with the Y axis (car wheels)
+WHEEL_ROTATION = trimesh.transformations.rotation_matrix(np.pi / 2, [1, 0, 0])
+
+
+def _stack_faces(parts: list) -> np.ndarray:
+    """Stack the faces of (vertices, faces) parts, offsetting indices as vertices are appended"""
+    faces = []
+    offset = 0
+    for vertices, part_faces in parts:
+        faces.append(part_faces + offset)
+        offset += len(vertices)
+    return np.vstack(faces)
+
+
+@functools.lru_cache(maxsize=4)
+def _cylinder(radius: float, height: float, sections: int, rotate_x: bool) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Build a cylinder template once and return its (vertices, faces)
+
+    Callers offset the returned vertices instead of constructing a new
+    cylinder per wheel/leg; the arrays must not be modified in place.
+    """
+    # Keep trimesh's processing here: it merges the duplicate seam/cap vertices
+    cylinder = trimesh.creation.cylinder(radius=radius, height=height, sections=sections)
+    vertices = np.array(cylinder.vertices)
+    if rotate_x:
+        vertices = vertices @ WHEEL_ROTATION[:3, :3].T
+    return vertices, np.array(cylinder.faces)
+
+
+def _build_car_template() -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Build the car template from primitives once at import time
+
+    Returns:
+        Tuple of (scaled_vertices, fixed_vertices, faces). Per request the
+        vertices are scaled_vertices * [scale_x, scale_y, scale_z] + fixed_vertices:
+        body and roof stretch with the sketch, while wheels keep their size and
+        only their positions scale.
+    """
+    # Main body and roof at unit scale
+    body = trimesh.creation.box(extents=[1.0, 1.0, 1.0])
+    body_verts = np.array(body.vertices)
+
+    roof = trimesh.creation.box(extents=[0.6, 1.0, 0.5])
+    roof_verts = roof.vertices + [0, 0, 0.7]
+
+    # Wheels (4 cylinders rotated to align with Y axis), positions as
+    # fractions of the body scale
+    wheel_verts, wheel_faces = _cylinder(radius=0.3, height=0.2, sections=16, rotate_x=True)
+    positions = [
+        [0.4, 0.6, -0.3],
+        [0.4, -0.6, -0.3],
+        [-0.4, 0.6, -0.3],
+        [-0.4, -0.6, -0.3],
+    ]
+
+    parts = [(body_verts, body.faces), (roof_verts, roof.faces)]
+    parts += [(wheel_verts, wheel_faces)] * len(positions)
+
+    scaled = [body_verts, roof_verts] + [
+        np.broadcast_to(pos, wheel_verts.shape) for pos in positions
+    ]
+    fixed = [np.zeros_like(body_verts), np.zeros_like(roof_verts)] + [
+        wheel_verts
+    ] * len(positions)
+
+    return np.vstack(scaled), np.vstack(fixed), _stack_faces(parts)
+
+
+def _build_chair_template() -> tuple[np.ndarray, np.ndarray]:
+    """Build the chair template (vertices, faces) from primitives once at import time"""
+    # Seat
+    seat = trimesh.creation.box(extents=[1.5, 1.5, 0.2])
+    seat_verts = seat.vertices + [0, 0, 1.0]
+
+    # Backrest
+    backrest = trimesh.creation.box(extents=[1.5, 0.2, 1.5])
+    backrest_verts = backrest.vertices + [0, -0.7, 1.8]
+
+    # Legs (4 cylinders)
+    leg_height = 1.0
+    leg_verts, leg_faces = _cylinder(radius=0.08, height=leg_height, sections=12, rotate_x=False)
+    positions = [
+        [0.6, 0.6, leg_height / 2],
+        [0.6, -0.6, leg_height / 2],
+        [-0.6, 0.6, leg_height / 2],
+        [-0.6, -0.6, leg_height / 2],
+    ]
+
+    parts = [(seat_verts, seat.faces), (backrest_verts, backrest.faces)]
+    parts += [(leg_verts + pos, leg_faces) for pos in positions]
+
+    return np.vstack([vertices for vertices, _ in parts]), _stack_faces(parts)
+
+
+# Precomputed vertex/face buffers; requests only rescale vertices
+BASE_CAR_VERTS, BASE_CAR_FIXED_VERTS, BASE_CAR_FACES = _build_car_template()
+BASE_CHAIR_VERTS, BASE_CHAIR_FACES = _build_chair_template()
+
+for _array in (BASE_CAR_VERTS, BASE_CAR_FIXED_VERTS, BASE_CAR_FACES, BASE_CHAIR_VERTS, BASE_CHAIR_FACES):
+    _array.setflags(write=False)
+
 class DemoMeshGenerator:
     """
     Demo mesh generator that creates simple 3D shapes based on sketch analysis
@@ -13,47 +133,92 @@ class DemoMeshGenerator:
     """
 
     @staticmethod
-    async def generate_mesh_from_sketch(
-        sketch_path: str,
-        model_type: str,
-        output_path: str
-    ) -> bool:
+    def load_sketch_mask(sketch_path: str) -> np.ndarray:
         """
-        Generate a simple 3D mesh based on sketch analysis
+        Load a sketch and return its drawn-pixel mask
 
         Args:
             sketch_path: Path to the input sketch image
-            model_type: Type of model ("cars" or "chairs") - affects shape
-            output_path: Path to save the output GLB file
 
         Returns:
-            bool: True if generation successful, False otherwise
+            Boolean array (at most ANALYSIS_SIZE) that is True where the sketch is drawn
         """
-        try:
-            logger.info(f"Analyzing sketch at {sketch_path}")
+        logger.info(f"Analyzing sketch at {sketch_path}")
+
+        # Only coarse coverage/aspect are needed, so decode at reduced size
+        # (JPEG draft skips IDCT work) and convert to grayscale before
+        # shrinking the rest of the way
+        with Image.open(sketch_path) as img:
+            img.draft('L', ANALYSIS_SIZE)
+            img = img.convert('L')
+        img.thumbnail(ANALYSIS_SIZE, Image.BILINEAR)
 
-            # Load and analyze the sketch
-            img = Image.open(sketch_path).convert('L')  # Convert to grayscale
-            img_array = np.array(img)
+        return np.asarray(img) < 200
 
-            # Calculate sketch properties
-            non_white_pixels = np.sum(img_array < 200)  # Count drawn pixels
-            total_pixels = img_array.size
-            coverage = non_white_pixels / total_pixels
+    @staticmethod
+    def analyze_masks(masks: list[np.ndarray]) -> list[SketchFeatures]:
+        """
+        Compute sketch properties for a batch of masks in one vectorized pass
+
+        Args:
+            masks: Drawn-pixel masks from load_sketch_mask (shapes may differ)
+
+        Returns:
+            SketchFeatures for each mask, in order
+        """
+        # Stack into one (K, H, W) array; False padding doesn't change counts or bounds
+        stack = np.zeros(
+            (len(masks), max(m.shape[0] for m in masks), max(m.shape[1] for m in masks)),
+            dtype=bool
+        )
+        for i, mask in enumerate(masks):
+            stack[i, :mask.shape[0], :mask.shape[1]] = mask
+
+        drawn_counts = np.count_nonzero(stack, axis=(1, 2))  # Count drawn pixels
+        drawn_rows = stack.any(axis=2)
+        drawn_cols = stack.any(axis=1)
+
+        features = []
+        for mask, drawn, rows, cols in zip(masks, drawn_counts, drawn_rows, drawn_cols):
+            coverage = drawn / mask.size
 
             # Get bounding box of drawing
-            rows = np.any(img_array < 200, axis=1)
-            cols = np.any(img_array < 200, axis=0)
-            if rows.any() and cols.any():
-                ymin, ymax = np.where(rows)[0][[0, -1]]
-                xmin, xmax = np.where(cols)[0][[0, -1]]
-                width = xmax - xmin
-                height = ymax - ymin
+            row_idx = np.flatnonzero(rows)
+            col_idx = np.flatnonzero(cols)
+            if row_idx.size and col_idx.size:
+                width = int(col_idx[-1] - col_idx[0])
+                height = int(row_idx[-1] - row_idx[0])
                 aspect_ratio = width / max(height, 1)
             else:
                 aspect_ratio = 1.0
                 width = height = 0
 
+            features.append(SketchFeatures(float(coverage), aspect_ratio, width, height))
+
+        return features
+
+    @staticmethod
+    def generate_mesh(
+        features: SketchFeatures,
+        model_type: str,
+        output_path: str
+    ) -> Optional[bytes]:
+        """
+        Generate a simple 3D mesh from analyzed sketch properties
+
+        This is CPU-bound and synchronous; run it in a worker process
+        rather than on the event loop.
+
+        Args:
+            features: Sketch properties from analyze_masks
+            model_type: Type of model ("cars" or "chairs") - affects shape
+            output_path: Path to save the output GLB file
+
+        Returns:
+            The GLB file contents if generation successful, None otherwise
+        """
+        try:
+            coverage, aspect_ratio, width, height = features
             logger.info(f"Sketch analysis: coverage={coverage:.2%}, aspect={aspect_ratio:.2f}")
 
             # Generate mesh based on model type and sketch properties
@@ -66,106 +231,43 @@ class DemoMeshGenerator:
                     coverage, aspect_ratio, width, height
                 )
 
-            # Export to GLB
-            mesh.export(output_path, file_type='glb')
+            # Export to GLB, keeping the bytes so callers can serve them from memory
+            glb_data = mesh.export(file_type='glb')
+            with open(output_path, 'wb') as f:
+                f.write(glb_data)
+
+            # Shrink the download with gltfpack when enabled and available
+            if settings.GLB_COMPRESSION and MeshConverter.compress_glb(output_path):
+                with open(output_path, 'rb') as f:
+                    glb_data = f.read()
 
             logger.info(f"Generated demo mesh at {output_path}")
-            return True
+            return glb_data
 
         except Exception as e:
             logger.error(f"Error generating demo mesh: {str(e)}")
-            return False
+            return None
 
     @staticmethod
     def _generate_car_like_mesh(coverage: float, aspect_ratio: float, width: int, height: int) -> trimesh.Trimesh:
         """Generate a car-like shape"""
-        # Create a car-like shape using boxes
-
         # Main body (scaled by sketch dimensions)
         scale_x = max(2.0, aspect_ratio * 1.5)
         scale_y = 0.8
         scale_z = 1.2
 
-        body = trimesh.creation.box(extents=[scale_x, scale_y, scale_z])
-
-        # Roof (smaller, on top)
-        roof = trimesh.creation.box(extents=[scale_x * 0.6, scale_y, scale_z * 0.5])
-        roof.apply_translation([0, 0, scale_z * 0.7])
-
-        # Wheels (4 cylinders)
-        wheel_radius = 0.3
-        wheel_height = 0.2
-
-        wheels = []
-        positions = [
-            [scale_x * 0.4, scale_y * 0.6, -scale_z * 0.3],
-            [scale_x * 0.4, -scale_y * 0.6, -scale_z * 0.3],
-            [-scale_x * 0.4, scale_y * 0.6, -scale_z * 0.3],
-            [-scale_x * 0.4, -scale_y * 0.6, -scale_z * 0.3],
-        ]
-
-        for pos in positions:
-            wheel = trimesh.creation.cylinder(
-                radius=wheel_radius,
-                height=wheel_height,
-                sections=16
-            )
-            # Rotate to align with Y axis
-            wheel.apply_transform(trimesh.transformations.rotation_matrix(
-                np.pi / 2, [1, 0, 0]
-            ))
-            wheel.apply_translation(pos)
-            wheels.append(wheel)
-
-        # Combine all parts
-        meshes = [body, roof] + wheels
-        combined = trimesh.util.concatenate(meshes)
-
         # Center and scale based on coverage (more coverage = larger model)
         scale_factor = 0.5 + (coverage * 1.5)
-        combined.apply_scale(scale_factor)
 
-        return combined
+        scale = np.array([scale_x, scale_y, scale_z])
+        vertices = (BASE_CAR_VERTS * scale + BASE_CAR_FIXED_VERTS) * scale_factor
+
+        return trimesh.Trimesh(vertices, BASE_CAR_FACES, process=False)
 
     @staticmethod
     def _generate_chair_like_mesh(coverage: float, aspect_ratio: float, width: int, height: int) -> trimesh.Trimesh:
         """Generate a chair-like shape"""
-
-        # Seat
-        seat = trimesh.creation.box(extents=[1.5, 1.5, 0.2])
-        seat.apply_translation([0, 0, 1.0])
-
-        # Backrest
-        backrest = trimesh.creation.box(extents=[1.5, 0.2, 1.5])
-        backrest.apply_translation([0, -0.7, 1.8])
-
-        # Legs (4 cylinders)
-        leg_radius = 0.08
-        leg_height = 1.0
-
-        legs = []
-        positions = [
-            [0.6, 0.6, leg_height / 2],
-            [0.6, -0.6, leg_height / 2],
-            [-0.6, 0.6, leg_height / 2],
-            [-0.6, -0.6, leg_height / 2],
-        ]
-
-        for pos in positions:
-            leg = trimesh.creation.cylinder(
-                radius=leg_radius,
-                height=leg_height,
-                sections=12
-            )
-            leg.apply_translation(pos)
-            legs.append(leg)
-
-        # Combine all parts
-        meshes = [seat, backrest] + legs
-        combined = trimesh.util.concatenate(meshes)
-
         # Scale based on coverage
         scale_factor = 0.5 + (coverage * 1.5)
-        combined.apply_scale(scale_factor)
 
-        return combined
+        return trimesh.Trimesh(BASE_CHAIR_VERTS * scale_factor, BASE_CHAIR_FACES, process=False)
@@ -1,6 +1,8 @@
 import os
 import uuid
-import aiofiles
+import hashlib
+import asyncio
+import anyio
 import logging
 from pathlib import Path
 from datetime import datetime, timedelta
@@ -11,19 +13,30 @@ from app.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Uploads are streamed to disk in chunks of this size
+UPLOAD_CHUNK_SIZE = 1 << 20
+
+# Fixed at startup; resolved once instead of per request. Paths are built
+# with f-strings below since deployments are POSIX.
+_UPLOADS_DIR = settings.UPLOADS_DIR.rstrip('/')
+_OUTPUTS_DIR = settings.OUTPUTS_DIR.rstrip('/')
+_MAX_UPLOAD_MB = settings.MAX_UPLOAD_SIZE_MB
+_MAX_UPLOAD_BYTES = _MAX_UPLOAD_MB * 1024 * 1024
+_CLEANUP_AFTER_HOURS = settings.CLEANUP_AFTER_HOURS
+
 class FileHandler:
     """Handles file upload, storage, and cleanup operations"""
 
     @staticmethod
-    async def save_upload(file: UploadFile) -> tuple[str, str]:
+    async def save_upload(file: UploadFile) -> tuple[str, str, str]:
         """
-        Save an uploaded file and return its mesh_id and file path
+        Save an uploaded file and return its mesh_id, file path and content hash
 
         Args:
             file: The uploaded file
 
         Returns:
-            Tuple of (mesh_id, file_path)
+            Tuple of (mesh_id, file_path, content_hash)
 
         Raises:
             HTTPException: If file validation or save fails
@@ -33,37 +46,42 @@ class FileHandler:
             if not file.content_type or not file.content_type.startswith('image/'):
                 raise HTTPException(status_code=400, detail="Invalid file type. Must be an image.")
 
-            # Read file content
-            content = await file.read()
-
-            # Validate file size
-            size_mb = len(content) / (1024 * 1024)
-            if size_mb > settings.MAX_UPLOAD_SIZE_MB:
-                raise HTTPException(
-                    status_code=413,
-                    detail=f"File too large. Maximum size is {settings.MAX_UPLOAD_SIZE_MB}MB"
-                )
-
             # Generate unique mesh ID
             mesh_id = str(uuid.uuid4())
 
             # Determine file extension
             ext = "png"
-            if file.content_type:
-                if "jpeg" in file.content_type or "jpg" in file.content_type:
-                    ext = "jpg"
-                elif "png" in file.content_type:
-                    ext = "png"
-
-            # Save file
-            file_path = os.path.join(settings.UPLOADS_DIR, f"{mesh_id}.{ext}")
-
-            async with aiofiles.open(file_path, 'wb') as f:
-                await f.write(content)
+            if "jpeg" in file.content_type or "jpg" in file.content_type:
+                ext = "jpg"
+            elif "png" in file.content_type:
+                ext = "png"
+
+            # Stream file to disk, validating size as bytes accumulate
+            file_path = f"{_UPLOADS_DIR}/{mesh_id}.{ext}"
+            size = 0
+            hasher = hashlib.blake2b(digest_size=16)
+
+            try:
+                async with await anyio.open_file(file_path, 'wb') as f:
+                    while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                        size += len(chunk)
+                        if size > _MAX_UPLOAD_BYTES:
+                            raise HTTPException(
+                                status_code=413,
+                                detail=f"File too large. Maximum size is {_MAX_UPLOAD_MB}MB"
+                            )
+                        hasher.update(chunk)
+                        await f.write(chunk)
+            except BaseException:
+                # Don't leave a partial upload behind
+                if os.path.exists(file_path):
+                    os.remove(file_path)
+                raise
 
+            size_mb = size / (1024 * 1024)
             logger.info(f"Saved upload {mesh_id} to {file_path} ({size_mb:.2f}MB)")
 
-            return mesh_id, file_path
+            return mesh_id, file_path, hasher.hexdigest()
 
         except HTTPException:
             raise
@@ -83,7 +101,7 @@ class FileHandler:
         Returns:
             Full path to the output file
         """
-        return os.path.join(settings.OUTPUTS_DIR, f"{mesh_id}.{extension}")
+        return f"{_OUTPUTS_DIR}/{mesh_id}.{extension}"
 
     @staticmethod
     def file_exists(file_path: str) -> bool:
@@ -107,7 +125,7 @@ class FileHandler:
         if not FileHandler.file_exists(file_path):
             raise FileNotFoundError(f"File not found: {file_path}")
 
-        async with aiofiles.open(file_path, 'rb') as f:
+        async with await anyio.open_file(file_path, 'rb') as f:
             return await f.read()
 
     @staticmethod
@@ -118,13 +136,15 @@ class FileHandler:
         This should be run as a background task
         """
         try:
-            cutoff_time = datetime.now() - timedelta(hours=settings.CLEANUP_AFTER_HOURS)
+            cutoff_time = datetime.now() - timedelta(hours=_CLEANUP_AFTER_HOURS)
+            cutoff_ts = cutoff_time.timestamp()
 
+            # Directory scans and unlinks are blocking, so keep them off the event loop
             # Cleanup uploads
-            await FileHandler._cleanup_directory(settings.UPLOADS_DIR, cutoff_time)
+            await asyncio.to_thread(FileHandler._cleanup_directory, _UPLOADS_DIR, cutoff_ts)
 
             # Cleanup outputs
-            await FileHandler._cleanup_directory(settings.OUTPUTS_DIR, cutoff_time)
+            await asyncio.to_thread(FileHandler._cleanup_directory, _OUTPUTS_DIR, cutoff_ts)
 
             logger.info("File cleanup completed")
 
@@ -132,23 +152,19 @@ class FileHandler:
             logger.error(f"Error during file cleanup: {str(e)}")
 
     @staticmethod
-    async def _cleanup_directory(directory: str, cutoff_time: datetime):
-        """Clean up files in a directory older than cutoff_time"""
+    def _cleanup_directory(directory: str, cutoff_ts: float):
+        """Clean up files in a directory modified before cutoff_ts (POSIX timestamp)"""
         if not os.path.exists(directory):
             return
 
-        for filename in os.listdir(directory):
-            file_path = os.path.join(directory, filename)
-
-            if not os.path.isfile(file_path):
-                continue
-
-            # Get file modification time
-            file_mtime = datetime.fromtimestamp(os.path.getmtime(file_path))
-
-            if file_mtime < cutoff_time:
-                try:
-                    os.remove(file_path)
-                    logger.info(f"Removed old file: {file_path}")
-                except Exception as e:
-                    logger.error(f"Failed to remove {file_path}: {str(e)}")
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if not entry.is_file():
+                    continue
+
+                if entry.stat().st_mtime < cutoff_ts:
+                    try:
+                        os.remove(entry.path)
+                        logger.info(f"Removed old file: {entry.path}")
+                    except Exception as e:
+                        logger.error(f"Failed to remove {entry.path}: {str(e)}")
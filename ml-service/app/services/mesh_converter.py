@@ -1,9 +1,21 @@
 import os
+import shutil
 import logging
+import functools
+import subprocess
 import trimesh
 
 logger = logging.getLogger(__name__)
 
+
+@functools.lru_cache(maxsize=1)
+def _gltfpack_path() -> str:
+    """Locate the gltfpack binary once, warning if it isn't installed"""
+    path = shutil.which("gltfpack")
+    if not path:
+        logger.warning("gltfpack not found on PATH; GLB files will not be compressed")
+    return path or ""
+
 class MeshConverter:
     """Handles mesh file format conversions"""
 
@@ -93,3 +105,48 @@ class MeshConverter:
         except Exception as e:
             logger.error(f"Error optimizing mesh: {str(e)}")
             return False
+
+    @staticmethod
+    def compress_glb(glb_path: str) -> bool:
+        """
+        Compress a GLB file in place with gltfpack (quantized, meshopt-encoded)
+
+        Clients must support EXT_meshopt_compression to load the result.
+
+        Args:
+            glb_path: Path to the GLB file
+
+        Returns:
+            bool: True if the file was compressed, False otherwise
+        """
+        gltfpack = _gltfpack_path()
+        if not gltfpack:
+            return False
+
+        packed_path = f"{glb_path}.packed.glb"
+
+        try:
+            result = subprocess.run(
+                [gltfpack, "-i", glb_path, "-o", packed_path, "-cc"],
+                capture_output=True,
+                text=True,
+                timeout=60
+            )
+
+            if result.returncode != 0:
+                logger.error(f"gltfpack failed with code {result.returncode}: {result.stderr}")
+                return False
+
+            original_size = os.path.getsize(glb_path)
+            os.replace(packed_path, glb_path)
+            logger.info(f"Compressed GLB {original_size} -> {os.path.getsize(glb_path)} bytes: {glb_path}")
+
+            return True
+
+        except Exception as e:
+            logger.error(f"Error compressing GLB: {str(e)}")
+            return False
+
+        finally:
+            if os.path.exists(packed_path):
+                os.remove(packed_path)
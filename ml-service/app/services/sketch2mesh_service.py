@@ -1,156 +1,238 @@
 import os
+import shutil
+import asyncio
 import subprocess
+import anyio
 import logging
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+from typing import Optional
 
-from app.config import settings
+from app.config import settings, redis_client
 from app.services.demo_mesh_generator import DemoMeshGenerator
+from app.services.file_handler import FileHandler
+from app.services.sketch_batcher import SketchAnalysisBatcher
 
 logger = logging.getLogger(__name__)
 
 # DEMO MODE: Using simple mesh generator since pretrained models aren't available
 USE_DEMO_MODE = True
 
-class Sketch2MeshService:
-    """Service for running sketch2mesh model inference (currently in DEMO mode)"""
-
-    @staticmethod
-    async def convert_sketch_to_mesh(
-        sketch_path: str,
-        model_type: str,
-        sketch_style: str,
-        output_path: str
-    ) -> bool:
-        """
-        Convert a 2D sketch to a 3D mesh
-
-        Args:
-            sketch_path: Path to the input sketch image
-            model_type: Type of model ("cars" or "chairs")
-            sketch_style: Style of sketch ("suggestive", "fd", "handdrawn")
-            output_path: Path to save the output GLB file
-
-        Returns:
-            bool: True if conversion successful, False otherwise
-        """
-        try:
-            # Validate inputs
-            if not os.path.exists(sketch_path):
-                logger.error(f"Sketch file not found: {sketch_path}")
-                return False
-
-            if USE_DEMO_MODE:
-                # Use demo generator
-                logger.info(f"DEMO MODE: Generating simple {model_type} mesh from sketch")
-                return await DemoMeshGenerator.generate_mesh_from_sketch(
-                    sketch_path=sketch_path,
-                    model_type=model_type,
-                    output_path=output_path
-                )
-            else:
-                # Original sketch2mesh code (disabled until models are available)
-                logger.info(f"Starting sketch2mesh conversion: {model_type}, {sketch_style}")
-                return await Sketch2MeshService._run_real_sketch2mesh(
-                    sketch_path, model_type, sketch_style, output_path
-                )
+# Worker processes for CPU-bound mesh generation (created in the app lifespan)
+pool: Optional[ProcessPoolExecutor] = None
+
+# Coalesces concurrent sketch analyses (started in the app lifespan)
+batcher = SketchAnalysisBatcher(
+    max_batch_size=settings.SKETCH_BATCH_MAX_SIZE,
+    window_ms=settings.SKETCH_BATCH_WINDOW_MS
+)
+
+
+def process_pool_size() -> int:
+    """
+    Mesh generation processes per server worker
+
+    Every uvicorn worker runs its own lifespan and pool, so the CPUs are
+    split between them rather than each worker claiming all of them.
+    """
+    return max(1, (os.cpu_count() or 1) // max(1, settings.WEB_CONCURRENCY))
+
+
+def start_process_pool():
+    """Create the process pool used for mesh generation"""
+    global pool
+    workers = process_pool_size()
+    pool = ProcessPoolExecutor(max_workers=workers)
+    logger.info(f"Started mesh generation pool with {workers} workers")
+
+
+def shutdown_process_pool():
+    """Shut down the mesh generation process pool"""
+    global pool
+    if pool is not None:
+        pool.shutdown(wait=True, cancel_futures=True)
+        pool = None
+
+
+async def convert_sketch_to_mesh(
+    sketch_path: str,
+    model_type: str,
+    sketch_style: str,
+    output_path: str,
+    content_hash: Optional[str] = None
+) -> Optional[bytes]:
+    """
+    Convert a 2D sketch to a 3D mesh
+
+    Args:
+        sketch_path: Path to the input sketch image
+        model_type: Type of model ("cars" or "chairs")
+        sketch_style: Style of sketch ("suggestive", "fd", "handdrawn")
+        output_path: Path to save the output GLB file
+        content_hash: Hash of the sketch contents, used to reuse earlier meshes
+
+    Returns:
+        The GLB file contents if conversion successful, None otherwise
+    """
+    try:
+        # Validate inputs
+        if not os.path.exists(sketch_path):
+            logger.error(f"Sketch file not found: {sketch_path}")
+            return None
+
+        # Reuse the mesh from an identical earlier sketch if it's still around;
+        # the cache is best-effort, so any failure falls through to generation
+        cache_key = None
+        if content_hash:
+            cache_key = f"mesh:{content_hash}:{model_type}:{sketch_style}"
+            try:
+                glb_data = await _copy_cached_mesh(cache_key, output_path)
+            except Exception as e:
+                logger.warning(f"Failed to reuse cached mesh for sketch {content_hash}: {str(e)}")
+                glb_data = None
+            if glb_data is not None:
+                logger.info(f"Reused cached mesh for sketch {content_hash}")
+                return glb_data
+
+        if USE_DEMO_MODE:
+            # Use demo generator in a worker process so the event loop stays free
+            logger.info(f"DEMO MODE: Generating simple {model_type} mesh from sketch")
+            features = await batcher.analyze(sketch_path)
+            glb_data = await asyncio.get_running_loop().run_in_executor(
+                pool,
+                DemoMeshGenerator.generate_mesh,
+                features,
+                model_type,
+                output_path
+            )
+        else:
+            # Original sketch2mesh code (disabled until models are available)
+            logger.info(f"Starting sketch2mesh conversion: {model_type}, {sketch_style}")
+            glb_data = await _run_real_sketch2mesh(
+                sketch_path, model_type, sketch_style, output_path
+            )
 
-        except Exception as e:
-            logger.error(f"Error during conversion: {str(e)}")
+        if glb_data is not None and cache_key:
+            try:
+                await redis_client.set(
+                    cache_key, output_path, ex=settings.CLEANUP_AFTER_HOURS * 3600
+                )
+            except Exception as e:
+                logger.warning(f"Failed to cache mesh for sketch {content_hash}: {str(e)}")
+
+        return glb_data
+
+    except Exception as e:
+        logger.error(f"Error during conversion: {str(e)}")
+        return None
+
+
+async def _copy_cached_mesh(cache_key: str, output_path: str) -> Optional[bytes]:
+    """Copy a previously generated mesh to output_path and return its contents, if cached"""
+    cached_path = await redis_client.get(cache_key)
+
+    # The file may have been removed by the periodic cleanup
+    if not cached_path or not FileHandler.file_exists(cached_path):
+        return None
+
+    glb_data = await FileHandler.read_file(cached_path)
+    async with await anyio.open_file(output_path, 'wb') as f:
+        await f.write(glb_data)
+    return glb_data
+
+
+async def _run_real_sketch2mesh(
+    sketch_path: str,
+    model_type: str,
+    sketch_style: str,
+    output_path: str
+) -> Optional[bytes]:
+    """Original sketch2mesh implementation (requires pretrained models)"""
+    # This code is preserved for when models become available
+    logger.error("Real sketch2mesh mode is disabled - pretrained models not available")
+    return None
+
+
+async def _run_reconstruction(
+    sketch_path: str,
+    model_path: str,
+    model_type: str,
+    sketch_style: str,
+    output_dir: str
+) -> bool:
+    """Run the sketch2mesh reconstruction script"""
+    try:
+        # Path to the reconstruction script
+        reconstruct_script = os.path.join(
+            settings.SKETCH2MESH_DIR,
+            "reconstruct_sketch2mesh.py"
+        )
+
+        if not os.path.exists(reconstruct_script):
+            logger.error(f"Reconstruction script not found: {reconstruct_script}")
             return False
 
-    @staticmethod
-    async def _run_real_sketch2mesh(
-        sketch_path: str,
-        model_type: str,
-        sketch_style: str,
-        output_path: str
-    ) -> bool:
-        """Original sketch2mesh implementation (requires pretrained models)"""
-        # This code is preserved for when models become available
-        logger.error("Real sketch2mesh mode is disabled - pretrained models not available")
-        return False
-
-    @staticmethod
-    async def _run_reconstruction(
-        sketch_path: str,
-        model_path: str,
-        model_type: str,
-        sketch_style: str,
-        output_dir: str
-    ) -> bool:
-        """Run the sketch2mesh reconstruction script"""
-        try:
-            # Path to the reconstruction script
-            reconstruct_script = os.path.join(
-                settings.SKETCH2MESH_DIR,
-                "reconstruct_sketch2mesh.py"
-            )
-
-            if not os.path.exists(reconstruct_script):
-                logger.error(f"Reconstruction script not found: {reconstruct_script}")
-                return False
-
-            # Build command
-            # Note: The exact command structure may need to be adjusted based on
-            # the actual sketch2mesh API. This is a placeholder.
-            cmd = [
-                "python",
-                reconstruct_script,
-                "--sketch", sketch_path,
-                "--model", model_path,
-                "--category", model_type,
-                "--style", sketch_style,
-                "--output", output_dir
-            ]
-
-            logger.info(f"Running command: {' '.join(cmd)}")
-
-            # Run the subprocess
-            result = subprocess.run(
-                cmd,
-                cwd=settings.SKETCH2MESH_DIR,
-                capture_output=True,
-                text=True,
-                timeout=300  # 5 minute timeout
-            )
+        # Build command
+        # Note: The exact command structure may need to be adjusted based on
+        # the actual sketch2mesh API. This is a placeholder.
+        cmd = [
+            "python",
+            reconstruct_script,
+            "--sketch", sketch_path,
+            "--model", model_path,
+            "--category", model_type,
+            "--style", sketch_style,
+            "--output", output_dir
+        ]
+
+        logger.info(f"Running command: {' '.join(cmd)}")
+
+        # Run the subprocess
+        result = subprocess.run(
+            cmd,
+            cwd=settings.SKETCH2MESH_DIR,
+            capture_output=True,
+            text=True,
+            timeout=300  # 5 minute timeout
+        )
+
+        if result.returncode != 0:
+            logger.error(f"Reconstruction failed with code {result.returncode}")
+            logger.error(f"STDOUT: {result.stdout}")
+            logger.error(f"STDERR: {result.stderr}")
+            return False
 
-            if result.returncode != 0:
-                logger.error(f"Reconstruction failed with code {result.returncode}")
-                logger.error(f"STDOUT: {result.stdout}")
-                logger.error(f"STDERR: {result.stderr}")
-                return False
+        logger.info("Reconstruction completed successfully")
+        logger.debug(f"STDOUT: {result.stdout}")
 
-            logger.info("Reconstruction completed successfully")
-            logger.debug(f"STDOUT: {result.stdout}")
+        return True
 
-            return True
+    except subprocess.TimeoutExpired:
+        logger.error("Reconstruction timed out after 5 minutes")
+        return False
+    except Exception as e:
+        logger.error(f"Error running reconstruction: {str(e)}")
+        return False
 
-        except subprocess.TimeoutExpired:
-            logger.error("Reconstruction timed out after 5 minutes")
-            return False
-        except Exception as e:
-            logger.error(f"Error running reconstruction: {str(e)}")
-            return False
 
-    @staticmethod
-    def _find_obj_file(directory: str) -> str:
-        """Find the first OBJ file in a directory"""
-        try:
-            for file in os.listdir(directory):
-                if file.lower().endswith('.obj'):
-                    return os.path.join(directory, file)
-            return ""
-        except Exception as e:
-            logger.error(f"Error finding OBJ file: {str(e)}")
-            return ""
-
-    @staticmethod
-    def _cleanup_intermediate_files(directory: str):
-        """Clean up intermediate files and directories"""
-        try:
-            import shutil
-            if os.path.exists(directory):
-                shutil.rmtree(directory)
-                logger.info(f"Cleaned up intermediate files: {directory}")
-        except Exception as e:
-            logger.warning(f"Failed to clean up {directory}: {str(e)}")
+def _find_obj_file(directory: str) -> str:
+    """Find the first OBJ file in a directory"""
+    try:
+        with os.scandir(directory) as entries:
+            return next(
+                (entry.path for entry in entries if entry.name.lower().endswith('.obj')),
+                ""
+            )
+    except Exception as e:
+        logger.error(f"Error finding OBJ file: {str(e)}")
+        return ""
+
+
+def _cleanup_intermediate_files(directory: str):
+    """Clean up intermediate files and directories"""
+    try:
+        if os.path.exists(directory):
+            shutil.rmtree(directory)
+            logger.info(f"Cleaned up intermediate files: {directory}")
+    except Exception as e:
+        logger.warning(f"Failed to clean up {directory}: {str(e)}")
@@ -0,0 +1,103 @@
+import asyncio
+import logging
+from typing import Optional
+
+from app.services.demo_mesh_generator import DemoMeshGenerator, SketchFeatures
+
+logger = logging.getLogger(__name__)
+
+class SketchAnalysisBatcher:
+    """
+    Coalesces concurrent sketch analyses into batched NumPy reductions
+
+    Each caller loads its own mask, then queues it. A single background task
+    takes whatever is queued (waiting up to window_ms for more only when other
+    requests are already pending) and analyzes the batch in one vectorized call.
+    """
+
+    def __init__(self, max_batch_size: int = 16, window_ms: float = 5.0):
+        self.max_batch_size = max_batch_size
+        self.window = window_ms / 1000
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Start the background batching task"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the background task and cancel any analyses still queued"""
+        if self._task is None:
+            return
+
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+        while not self._queue.empty():
+            _, future = self._queue.get_nowait()
+            future.cancel()
+
+    async def analyze(self, sketch_path: str) -> SketchFeatures:
+        """
+        Analyze a sketch, batching with any concurrent analyses
+
+        Args:
+            sketch_path: Path to the input sketch image
+
+        Returns:
+            SketchFeatures for the sketch
+        """
+        mask = await asyncio.to_thread(DemoMeshGenerator.load_sketch_mask, sketch_path)
+
+        # Not started (e.g. outside the app lifespan): analyze directly
+        if self._task is None:
+            return DemoMeshGenerator.analyze_masks([mask])[0]
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((mask, future))
+        return await future
+
+    async def _run(self):
+        """Background task that drains the queue in batches"""
+        loop = asyncio.get_running_loop()
+
+        while True:
+            batch = [await self._queue.get()]
+
+            # Only wait for more work when other requests are already queued
+            if not self._queue.empty():
+                deadline = loop.time() + self.window
+                while len(batch) < self.max_batch_size:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                    except asyncio.TimeoutError:
+                        break
+
+            if len(batch) > 1:
+                logger.info(f"Analyzing batch of {len(batch)} sketches")
+
+            try:
+                results = await asyncio.to_thread(
+                    DemoMeshGenerator.analyze_masks, [mask for mask, _ in batch]
+                )
+            except asyncio.CancelledError:
+                for _, future in batch:
+                    future.cancel()
+                raise
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            for (_, future), features in zip(batch, results):
+                if not future.done():
+                    future.set_result(features)